@@ -10,8 +10,13 @@ def gps_init():
 
     return gpsd_socket, data_stream
 
-def get_gps(gps_socket, data_stream):
+def get_gps(gps_socket, data_stream, timeout=None):
+    # with a timeout, give up and return None if no valid fix arrives in time
+    deadline = None if timeout is None else time.monotonic() + timeout
     for new_data in gps_socket:
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+
         if new_data:
             data_stream.unpack(new_data)
             data_list = [data_stream.TPV['time'],data_stream.TPV['lon'],data_stream.TPV['lat'],data_stream.TPV['alt'],
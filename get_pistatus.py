@@ -1,14 +1,30 @@
 import subprocess as sp
+import time
+
+CPU_TEMP_PATH = "/sys/class/thermal/thermal_zone0/temp"
+CALL_RETRIES = 3
 
 def call(x):
-    while True:
-        result = sp.check_output(x, shell = True)
-        if result:
-            return result.decode('utf-8').strip()
+    # retry a failing vcgencmd a bounded number of times, then raise
+    for attempt in range(CALL_RETRIES):
+        try:
+            return sp.check_output(x).decode('utf-8').strip()
+        except sp.CalledProcessError:
+            if attempt == CALL_RETRIES - 1:
+                raise
+            time.sleep(0.1)
+
+def get_cpu_temp():
+    # same value vcgencmd measure_temp reports, without a fork
+    try:
+        with open(CPU_TEMP_PATH) as fin:
+            return f"{int(fin.read()) / 1000:.1f}'C"
+    except (OSError, ValueError):
+        return call(["vcgencmd", "measure_temp"]).split('=')[1]
 
 def get_pistatus():
-    rpiv = call("vcgencmd measure_volts core").split('=')[1]
-    rpit = call("vcgencmd measure_temp").split('=')[1]
+    rpiv = call(["vcgencmd", "measure_volts", "core"]).split('=')[1]
+    rpit = get_cpu_temp()
     return [rpiv, rpit]
 
 if __name__ == "__main__":
@@ -1,23 +1,45 @@
 from sense_hat import SenseHat
 import time
 
-def get_sense(sense):
-    while True:
-        pressure = sense.get_pressure()
-        if pressure <= 0:
-            continue
+PRESSURE_RETRIES = 5
+SENSE_WIDTH = 9     # fields in a sense row
+NAN = float('nan')
+
+class SenseReader:
+    def __init__(self, sense):
+        # bind the sensor methods once for the life of the program
+        self.get_pressure = sense.get_pressure
+        self.get_humidity = sense.get_humidity
+        self.get_temperature = sense.get_temperature
+        self.get_orientation = sense.get_orientation
+        self.get_accelerometer_raw = sense.get_accelerometer_raw
+
+    def read(self):
+        get_pressure = self.get_pressure
+        get_humidity = self.get_humidity
+        get_temperature = self.get_temperature
+        get_orientation = self.get_orientation
+        get_accelerometer_raw = self.get_accelerometer_raw
+
+        for _ in range(PRESSURE_RETRIES):
+            pressure = get_pressure()
+            if pressure > 0:
+                break
+            time.sleep(0.02)
         else:
-            break
-    humidity = sense.get_humidity()
-    temp = sense.get_temperature()
-    ori = sense.get_orientation()
-    acc = sense.get_accelerometer_raw()
-    return [pressure, humidity, temp,
-            ori["pitch"], ori["roll"], ori["yaw"],
-            acc['x'], acc['y'], acc['z'],
-            ]
+            # keep the row the same width so the log columns stay aligned
+            return [NAN] * SENSE_WIDTH
+
+        humidity = get_humidity()
+        temp = get_temperature()
+        ori = get_orientation()
+        acc = get_accelerometer_raw()
+        return [pressure, humidity, temp,
+                ori["pitch"], ori["roll"], ori["yaw"],
+                acc['x'], acc['y'], acc['z'],
+                ]
 
 if __name__ == "__main__":
+    reader = SenseReader(SenseHat())
     while True:
-        sense = SenseHat()
-        print(get_sense(sense))
+        print(reader.read())
@@ -6,53 +6,80 @@ Up is Pause
 Down is Resume
 
 """
+import os
 import time
 import datetime
-import functools
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
 from sense_hat import SenseHat
 from get_gps import gps_init, get_gps, gps_clean
-from get_sense import get_sense
+from get_sense import SenseReader, SENSE_WIDTH
 from get_sensor import get_sensor
 from get_pistatus import get_pistatus
 
 def starter(sense):
     sense.clear()
+    sense.show_message("Welcome", scroll_speed = 0.05)
     while True:
-        sense.show_message("Welcome", scroll_speed = 0.05)
-        for event in sense.stick.get_events():
-            if event.action == "pressed":
-                if event.direction == "middle":
-                    sense.show_message("Start", scroll_speed = 0.05)
-                    return 0
-
-        time.sleep(0.1)
-
-def logger(log_name, data):
+        # presses made during the scroll are still buffered
+        event = sense.stick.wait_for_event()
+        if event.action == "pressed" and event.direction == "middle":
+            sense.show_message("Start", scroll_speed = 0.05)
+            return 0
+
+SAMPLE_PERIOD = 0.5
+# a GPS fix older than this is logged as NaN instead of being repeated;
+# covers a 1 Hz receiver plus jitter
+GPS_STALE_AFTER = 3 * SAMPLE_PERIOD
+GPS_RETRY_MIN = 0.1
+GPS_RETRY_MAX = 5.0
+SYNC_EVERY = 20
+LOG_BUFFER_SIZE = 1 << 17   # 128 KiB, holds many rows per write()
+HEADER = "time,lat,lon,alt,speed,climb,track,pressure,rh,temp,rx,ry,rz,accx,accy,accz,volt,pi_temp,"
+# one %s per column, trailing comma to match the header
+ROW_FMT = "%s," * HEADER.count(",") + "\n"
+# columns from gps, sense and pistatus; a failed read logs this many NaNs
+ROW_WIDTHS = (7, SENSE_WIDTH, 2)
+NAN = float("nan")
+
+def logger(fout, data, count):
     #print(data)
-    with open(log_name, "a") as fout:
-        for i in data:
-            fout.write(str(i)+',')
+    fout.write(ROW_FMT % tuple(data))
 
-        fout.write('\n')
+    # bound data loss on power cut without paying fsync per row
+    if count % SYNC_EVERY == 0:
+        fout.flush()
+        os.fsync(fout.fileno())
 
     return 0
 
 def logger_init():
-    header = "time,lat,lon,alt,speed,climb,track,pressure,rh,temp,rx,ry,rz,accx,accy,accz,volt,pi_temp,"
     curr = datetime.datetime.now()
     log_name = f"logger_{curr.year:04d}-{curr.month:02d}-{curr.day:02d}_{curr.hour:02d}-{curr.minute:02d}-{curr.second:02d}.log"
-    with open(log_name, "w") as fout:
-        print("Start Logging at " + log_name)
-        fout.write(header + "\n")
+    fout = open(log_name, "w", buffering=LOG_BUFFER_SIZE)
+    print("Start Logging at " + log_name)
+    fout.write(HEADER + "\n")
 
-    return log_name
+    return log_name, fout
 
-def thread_host(func, result, index, *args):
-    try:
-        result[index] = func(*args)
-    except Exception as e:
-        result[index] = f"Error: {e}"
+def gps_producer(gps_latest, gps_socket, data_stream):
+    # keep (newest fix, arrival time) in gps_latest[0] so samples never wait on gpsd
+    retry_delay = GPS_RETRY_MIN
+    last_error = None
+    while True:
+        try:
+            fix = get_gps(gps_socket, data_stream)
+            gps_latest[0] = (fix, time.monotonic())
+            retry_delay = GPS_RETRY_MIN
+            last_error = None
+        except Exception as e:
+            # report each distinct error once and back off while gpsd keeps failing
+            if str(e) != last_error:
+                print(f"GPS read error: {e}")
+                last_error = str(e)
+            gps_latest[0] = ([NAN] * ROW_WIDTHS[0], time.monotonic())
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, GPS_RETRY_MAX)
 
 if __name__ == "__main__":
     while True:
@@ -69,43 +96,69 @@ if __name__ == "__main__":
 
     results = [None] * 3
     params_sensor_1 = (gpsd_socket, data_stream)
-    params_sensor_2 = sense_device
+    sense_reader = SenseReader(sense_device)
 
     starter(sense_device)
-    file_out = logger_init()
+    log_name, file_out = logger_init()
+    sample_count = 0
 
-    while True:
-        while True:
-            for event in sense_device.stick.get_events():
-                if event.action == "pressed":
-                    if event.direction == "up":
-                        sense_device.show_message("Pause", scroll_speed = 0.05)
-                        pause_flag = True
-                    elif event.direction == "down":
-                        sense_device.show_message("Resume", scroll_speed = 0.05)
-                        pause_flag = False
-
-            if pause_flag:
-                continue
-                time.sleep(0.5)
-            else:
-                break
+    gps_latest = [None]
+    Thread(target=gps_producer, args=(gps_latest, *params_sensor_1), daemon=True).start()
 
-        thread_list = [
-                 Thread(target=thread_host, args=(get_gps, results, 0, *params_sensor_1)),
-                 Thread(target=thread_host, args=(get_sense, results, 1, params_sensor_2)),
-                 Thread(target=thread_host, args=(get_pistatus, results, 2)),
-               ]
+    # one worker pool for the whole run
+    executor = ThreadPoolExecutor(max_workers=2)
 
-        for thread_item in thread_list:
-            thread_item.start()
-
-        for thread_item in thread_list:
-            thread_item.join()
-
-        result_item = functools.reduce(lambda a, b: a+b, results)
-
-        logger(file_out, result_item)
-
-        sense_device.clear()
+    try:
+        while True:
+            while True:
+                for event in sense_device.stick.get_events():
+                    if event.action == "pressed":
+                        if event.direction == "up":
+                            sense_device.show_message("Pause", scroll_speed = 0.05)
+                            pause_flag = True
+                        elif event.direction == "down":
+                            sense_device.show_message("Resume", scroll_speed = 0.05)
+                            pause_flag = False
+
+                if pause_flag:
+                    continue
+                    time.sleep(0.5)
+                else:
+                    break
+
+            gps_fix = gps_latest[0]
+            if gps_fix is None:
+                # no fix yet
+                time.sleep(0.1)
+                continue
 
+            tick = time.monotonic()
+            futs = [
+                     executor.submit(sense_reader.read),
+                     executor.submit(get_pistatus),
+                   ]
+
+            fix, fix_time = gps_fix
+            if tick - fix_time > GPS_STALE_AFTER:
+                # fix lost, don't repeat the last position
+                fix = [NAN] * ROW_WIDTHS[0]
+            results[0] = fix
+            for index, fut in enumerate(futs, 1):
+                try:
+                    results[index] = fut.result()
+                except Exception as e:
+                    print(f"Sensor read error: {e}")
+                    results[index] = [NAN] * ROW_WIDTHS[index]
+
+            result_item = results[0] + results[1] + results[2]
+
+            sample_count += 1
+            logger(file_out, result_item, sample_count)
+
+            sense_device.clear()
+            time.sleep(max(0, SAMPLE_PERIOD - (time.monotonic() - tick)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=False)
+        file_out.close()
@@ -8,6 +8,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import queue
+import collections
 import csv
 import time
 from datetime import datetime
@@ -20,10 +21,63 @@ except ImportError:
     SENSE_HAT_AVAILABLE = False
     print("Warning: sense_hat module not available")
 
-from get_gps import get_gps, gps_clean
-from get_sense import get_sense
+from get_gps import gps_init, get_gps, gps_clean
+from get_sense import SenseReader
 from get_pistatus import get_pistatus
 
+# CSV rows are queued for a writer thread, which writes and flushes them once
+# WRITER_BATCH_ROWS have gathered or WRITER_BATCH_SECONDS after the first one
+WRITER_QUEUE_SIZE = 1024
+WRITER_BATCH_ROWS = 64
+WRITER_BATCH_SECONDS = 1.0
+
+# All Data tab shows the most recent TEXT_TAIL_LINES samples
+TEXT_TAIL_LINES = 500
+
+# (display label, data key) for each tab
+GPS_LABELS = (
+    ('Time', 'time'),
+    ('Latitude', 'lat'),
+    ('Longitude', 'lon'),
+    ('Altitude', 'alt'),
+    ('Speed', 'speed'),
+    ('Climb', 'climb'),
+    ('Track', 'track')
+)
+SENSE_LABELS = (
+    ('Pressure', 'pressure'),
+    ('Humidity', 'humidity'),
+    ('Temperature', 'temp'),
+    ('Pitch', 'pitch'),
+    ('Roll', 'roll'),
+    ('Yaw', 'yaw'),
+    ('Accel X', 'acc_x'),
+    ('Accel Y', 'acc_y'),
+    ('Accel Z', 'acc_z')
+)
+STATUS_LABELS = (
+    ('Core Voltage', 'voltage'),
+    ('CPU Temperature', 'cpu_temp')
+)
+
+# GPS reads give up after this long so the thread can notice a stop;
+# GPS shows as disconnected after GPS_LOST_AFTER without a fix
+GPS_READ_TIMEOUT = 0.5
+GPS_LOST_AFTER = 2.0
+
+# Data keys, in the order get_gps, SenseReader.read and get_pistatus return them
+GPS_FIELDS = ('time', 'lon', 'lat', 'alt', 'speed', 'climb', 'track')
+SENSE_FIELDS = ('pressure', 'humidity', 'temp', 'pitch', 'roll', 'yaw',
+                'acc_x', 'acc_y', 'acc_z')
+STATUS_FIELDS = ('voltage', 'cpu_temp')
+
+CSV_HEADER = ('time', 'lat', 'lon', 'alt', 'speed', 'climb', 'track',
+              'pressure', 'humidity', 'temp', 'pitch', 'roll', 'yaw',
+              'acc_x', 'acc_y', 'acc_z', 'voltage', 'cpu_temp')
+
+# Data rows bypass csv.writer; CRLF matches the header it writes
+CSV_ROW_FMT = ','.join(['%s'] * len(CSV_HEADER)) + '\r\n'
+
 
 class MonitorPanel:
     def __init__(self, root):
@@ -34,14 +88,29 @@ class MonitorPanel:
         # Data collection state
         self.collecting = False
         self.paused = False
-        self.data_queue = queue.Queue()
+        # Latest sample per sensor, replaced whole by the collection threads
+        self._latest = {'gps': None, 'sense': None, 'status': None}
         self.collection_threads = []
+        self._stop_event = None
 
         # File saving
         self.current_log_file = None
         self.csv_writer = None
         self.auto_save = True
 
+        # Latest data for CSV writing, updated in place
+        self.latest_gps = {}
+        self.latest_sense = {}
+        self.latest_status = {}
+
+        # Rows waiting for the CSV writer thread
+        self._row_queue = queue.Queue(maxsize=WRITER_QUEUE_SIZE)
+        self._writer_thread = None
+
+        # Recent lines for the All Data tab, redrawn once per UI tick
+        self._tail = collections.deque(maxlen=TEXT_TAIL_LINES)
+        self._tail_dirty = False
+
         # Sensor connections
         self.gps_connected = False
         self.sense_connected = False
@@ -49,9 +118,11 @@ class MonitorPanel:
 
         # Initialize Sense HAT if available
         self.sense = None
+        self.sense_reader = None
         if SENSE_HAT_AVAILABLE:
             try:
                 self.sense = SenseHat()
+                self.sense_reader = SenseReader(self.sense)
                 self.sense_connected = True
             except Exception as e:
                 print(f"Could not initialize Sense HAT: {e}")
@@ -196,26 +267,20 @@ class MonitorPanel:
         # GPS Tab
         gps_frame = tk.Frame(notebook)
         notebook.add(gps_frame, text="GPS Data")
-        self.gps_labels = self.create_data_grid(gps_frame, [
-            "Time", "Latitude", "Longitude", "Altitude",
-            "Speed", "Climb", "Track"
-        ])
+        self.gps_labels = self.create_data_grid(gps_frame, [label for label, _ in GPS_LABELS])
+        self._gps_update_tuples = tuple((self.gps_labels[label], key) for label, key in GPS_LABELS)
 
         # Sense HAT Tab
         sense_frame = tk.Frame(notebook)
         notebook.add(sense_frame, text="Sense HAT Data")
-        self.sense_labels = self.create_data_grid(sense_frame, [
-            "Pressure", "Humidity", "Temperature",
-            "Pitch", "Roll", "Yaw",
-            "Accel X", "Accel Y", "Accel Z"
-        ])
+        self.sense_labels = self.create_data_grid(sense_frame, [label for label, _ in SENSE_LABELS])
+        self._sense_update_tuples = tuple((self.sense_labels[label], key) for label, key in SENSE_LABELS)
 
         # System Status Tab
         system_frame = tk.Frame(notebook)
         notebook.add(system_frame, text="System Status")
-        self.system_labels = self.create_data_grid(system_frame, [
-            "Core Voltage", "CPU Temperature"
-        ])
+        self.system_labels = self.create_data_grid(system_frame, [label for label, _ in STATUS_LABELS])
+        self._status_update_tuples = tuple((self.system_labels[label], key) for label, key in STATUS_LABELS)
 
         # All Data Tab (Combined)
         all_frame = tk.Frame(notebook)
@@ -275,6 +340,7 @@ class MonitorPanel:
         try:
             # Close existing file if open
             if self.current_log_file:
+                self.stop_writer()
                 self.current_log_file.close()
 
             # Open new file
@@ -282,11 +348,9 @@ class MonitorPanel:
             self.csv_writer = csv.writer(self.current_log_file)
 
             # Write header
-            header = ['time', 'lat', 'lon', 'alt', 'speed', 'climb', 'track',
-                     'pressure', 'humidity', 'temp', 'pitch', 'roll', 'yaw',
-                     'acc_x', 'acc_y', 'acc_z', 'voltage', 'cpu_temp']
-            self.csv_writer.writerow(header)
+            self.csv_writer.writerow(CSV_HEADER)
             self.current_log_file.flush()
+            self.start_writer()
 
             # Update UI
             self.current_file_label.config(text=f"File: {os.path.basename(filename)}", fg="green")
@@ -319,6 +383,11 @@ class MonitorPanel:
         self.collecting = True
         self.paused = False
 
+        # Don't merge new samples with the previous session's values
+        self.latest_gps.clear()
+        self.latest_sense.clear()
+        self.latest_status.clear()
+
         # Update UI
         self.start_btn.config(state=tk.DISABLED)
         self.pause_btn.config(state=tk.NORMAL)
@@ -337,6 +406,7 @@ class MonitorPanel:
 
         self.collecting = False
         self.paused = False
+        self._stop_event.set()
 
         # Wait for threads to finish
         for thread in self.collection_threads:
@@ -347,6 +417,7 @@ class MonitorPanel:
 
         # Close log file
         if self.current_log_file:
+            self.stop_writer()
             self.current_log_file.close()
             self.current_log_file = None
             self.csv_writer = None
@@ -380,66 +451,80 @@ class MonitorPanel:
 
     def start_collection_threads(self):
         """Start data collection threads"""
-        # GPS thread
-        gps_thread = threading.Thread(target=self.gps_collection_loop, daemon=True)
+        # Each session gets its own stop event, so a thread left over from
+        # a previous session can't resume when collection restarts
+        self._stop_event = threading.Event()
+
+        # GPS thread, blocks on gpsd independently of the other sensors
+        gps_thread = threading.Thread(
+            target=self.gps_collection_loop,
+            args=(self._stop_event,),
+            daemon=True
+        )
         gps_thread.start()
         self.collection_threads.append(gps_thread)
 
-        # Sense HAT thread
-        sense_thread = threading.Thread(target=self.sense_collection_loop, daemon=True)
-        sense_thread.start()
-        self.collection_threads.append(sense_thread)
-
-        # System status thread
-        status_thread = threading.Thread(target=self.status_collection_loop, daemon=True)
-        status_thread.start()
-        self.collection_threads.append(status_thread)
+        # Sense HAT and system status
+        collect_thread = threading.Thread(
+            target=self.collection_loop,
+            args=(self._stop_event,),
+            daemon=True
+        )
+        collect_thread.start()
+        self.collection_threads.append(collect_thread)
 
-    def gps_collection_loop(self):
+    def gps_collection_loop(self, stop):
         """GPS data collection thread"""
+        gpsd_socket = None
         try:
-            while self.collecting:
-                if not self.paused:
-                    data = get_gps()
-                    if data:
-                        self.gps_connected = True
-                        self.data_queue.put(('gps', data))
-                    else:
-                        self.gps_connected = False
-                time.sleep(0.5)
+            gpsd_socket, data_stream = gps_init()
+            last_fix = time.monotonic()
+            while not stop.is_set():
+                if self.paused:
+                    stop.wait(0.1)
+                    continue
+
+                # Time out regularly so a stop is noticed without a fix
+                data = get_gps(gpsd_socket, data_stream, timeout=GPS_READ_TIMEOUT)
+                if data:
+                    last_fix = time.monotonic()
+                    self.gps_connected = True
+                    self._latest['gps'] = dict(zip(GPS_FIELDS, data))
+                elif time.monotonic() - last_fix > GPS_LOST_AFTER:
+                    self.gps_connected = False
         except Exception as e:
             print(f"GPS thread error: {e}")
             self.gps_connected = False
         finally:
-            gps_clean()
+            if gpsd_socket:
+                gps_clean(gpsd_socket)
+
+    def collection_loop(self, stop):
+        """Sense HAT and system status collection thread"""
+        # Both reads are fast, so they run one after the other on this thread
+        readers = {'status': (get_pistatus, STATUS_FIELDS)}
+        if self.sense_reader:
+            readers['sense'] = (self.sense_reader.read, SENSE_FIELDS)
+
+        while not stop.is_set() and readers:
+            if not self.paused:
+                for sensor_type, (read, fields) in list(readers.items()):
+                    try:
+                        data = read()
+                    except Exception as e:
+                        # Stop polling a sensor once it fails
+                        print(f"{sensor_type} collection error: {e}")
+                        del readers[sensor_type]
+                        data = None
 
-    def sense_collection_loop(self):
-        """Sense HAT data collection thread"""
-        try:
-            while self.collecting:
-                if not self.paused:
-                    data = get_sense()
                     if data:
-                        self.data_queue.put(('sense', data))
-                time.sleep(0.5)
-        except Exception as e:
-            print(f"Sense HAT thread error: {e}")
+                        # Display and CSV code look values up by key
+                        self._latest[sensor_type] = dict(zip(fields, data))
 
-    def status_collection_loop(self):
-        """System status data collection thread"""
-        try:
-            while self.collecting:
-                if not self.paused:
-                    data = get_pistatus()
-                    if data:
-                        self.pistatus_connected = True
-                        self.data_queue.put(('status', data))
-                    else:
-                        self.pistatus_connected = False
-                time.sleep(0.5)
-        except Exception as e:
-            print(f"Status thread error: {e}")
-            self.pistatus_connected = False
+                    if sensor_type == 'status':
+                        self.pistatus_connected = bool(data)
+
+            stop.wait(0.5)
 
     def update_connection_status(self):
         """Update connection status indicators"""
@@ -460,24 +545,29 @@ class MonitorPanel:
 
     def update_ui(self):
         """Update UI with latest data"""
-        # Process all items in queue
-        try:
-            while True:
-                sensor_type, data = self.data_queue.get_nowait()
-
-                if sensor_type == 'gps':
-                    self.update_gps_display(data)
-                elif sensor_type == 'sense':
-                    self.update_sense_display(data)
-                elif sensor_type == 'status':
-                    self.update_status_display(data)
-
-                # Write to CSV if file is open
-                if self.csv_writer and not self.paused:
-                    self.write_data_to_csv(sensor_type, data)
-
-        except queue.Empty:
-            pass
+        # Take the latest sample from each sensor (pop is atomic)
+        for sensor_type in ('gps', 'sense', 'status'):
+            data = self._latest.pop(sensor_type, None)
+            if data is None:
+                continue
+
+            if sensor_type == 'gps':
+                self.update_gps_display(data)
+            elif sensor_type == 'sense':
+                self.update_sense_display(data)
+            elif sensor_type == 'status':
+                self.update_status_display(data)
+
+            # Write to CSV if file is open
+            if self.csv_writer and not self.paused:
+                self.write_data_to_csv(sensor_type, data)
+
+        # Redraw the all data display from the recent lines
+        if self._tail_dirty:
+            self.all_data_text.delete('1.0', tk.END)
+            self.all_data_text.insert('1.0', '\n'.join(self._tail) + '\n')
+            self.all_data_text.see(tk.END)
+            self._tail_dirty = False
 
         # Update connection status
         if self.collecting:
@@ -491,75 +581,43 @@ class MonitorPanel:
         if not data:
             return
 
-        labels_map = {
-            'Time': 'time',
-            'Latitude': 'lat',
-            'Longitude': 'lon',
-            'Altitude': 'alt',
-            'Speed': 'speed',
-            'Climb': 'climb',
-            'Track': 'track'
-        }
-
-        for label, key in labels_map.items():
+        for widget, key in self._gps_update_tuples:
             value = data.get(key, '--')
             if value and value != 'n/a':
-                self.gps_labels[label].config(text=str(value))
+                widget.config(text=str(value))
 
     def update_sense_display(self, data):
         """Update Sense HAT data display"""
         if not data:
             return
 
-        labels_map = {
-            'Pressure': 'pressure',
-            'Humidity': 'humidity',
-            'Temperature': 'temp',
-            'Pitch': 'pitch',
-            'Roll': 'roll',
-            'Yaw': 'yaw',
-            'Accel X': 'acc_x',
-            'Accel Y': 'acc_y',
-            'Accel Z': 'acc_z'
-        }
-
-        for label, key in labels_map.items():
+        for widget, key in self._sense_update_tuples:
             value = data.get(key, '--')
             if value is not None:
                 if isinstance(value, float):
-                    self.sense_labels[label].config(text=f"{value:.2f}")
+                    widget.config(text=f"{value:.2f}")
                 else:
-                    self.sense_labels[label].config(text=str(value))
+                    widget.config(text=str(value))
 
     def update_status_display(self, data):
         """Update system status display"""
         if not data:
             return
 
-        labels_map = {
-            'Core Voltage': 'voltage',
-            'CPU Temperature': 'cpu_temp'
-        }
-
-        for label, key in labels_map.items():
+        for widget, key in self._status_update_tuples:
             value = data.get(key, '--')
             if value is not None:
-                self.system_labels[label].config(text=str(value))
-
-    # Store latest data for CSV writing
-    latest_gps = {}
-    latest_sense = {}
-    latest_status = {}
+                widget.config(text=str(value))
 
     def write_data_to_csv(self, sensor_type, data):
         """Write collected data to CSV file"""
         # Update latest data
         if sensor_type == 'gps':
-            self.latest_gps = data
+            self.latest_gps.update(data)
         elif sensor_type == 'sense':
-            self.latest_sense = data
+            self.latest_sense.update(data)
         elif sensor_type == 'status':
-            self.latest_status = data
+            self.latest_status.update(data)
 
         # Only write when we have all data
         if not (self.latest_gps and self.latest_sense and self.latest_status):
@@ -588,26 +646,69 @@ class MonitorPanel:
                 self.latest_status.get('cpu_temp', '')
             ]
 
-            # Write to CSV
-            self.csv_writer.writerow(row)
-            self.current_log_file.flush()
+            # Formatted on the writer thread; blocks only if it has
+            # fallen WRITER_QUEUE_SIZE rows behind
+            self._row_queue.put(row)
 
-            # Update all data text display
+            # Queue line for the all data text display
             data_str = f"[{datetime.now().strftime('%H:%M:%S')}] "
             data_str += f"GPS: {self.latest_gps.get('lat', 'N/A')}, {self.latest_gps.get('lon', 'N/A')} | "
             data_str += f"Temp: {self.latest_sense.get('temp', 'N/A')}°C | "
-            data_str += f"Alt: {self.latest_gps.get('alt', 'N/A')}m\n"
-
-            self.all_data_text.insert(tk.END, data_str)
-            self.all_data_text.see(tk.END)
-
-            # Limit text widget size
-            if int(self.all_data_text.index('end-1c').split('.')[0]) > 1000:
-                self.all_data_text.delete('1.0', '100.0')
+            data_str += f"Alt: {self.latest_gps.get('alt', 'N/A')}m"
+            self._tail.append(data_str)
+            self._tail_dirty = True
 
         except Exception as e:
             print(f"Error writing to CSV: {e}")
 
+    def start_writer(self):
+        """Start the CSV writer thread for the current log file"""
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            args=(self.current_log_file,),
+            daemon=True
+        )
+        self._writer_thread.start()
+
+    def stop_writer(self):
+        """Drain queued rows and stop the CSV writer thread"""
+        if self._writer_thread:
+            self._row_queue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+
+    def _writer_loop(self, log_file):
+        """Write queued CSV rows in batches until a None sentinel arrives"""
+        while True:
+            batch = [self._row_queue.get()]
+            deadline = time.monotonic() + WRITER_BATCH_SECONDS
+            while batch[-1] is not None and len(batch) < WRITER_BATCH_ROWS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._row_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+
+            try:
+                if batch:
+                    # No value contains a comma, quote or newline, so csv quoting is never needed
+                    log_file.write(''.join(
+                        CSV_ROW_FMT % tuple('' if v is None else v for v in row)
+                        for row in batch
+                    ))
+                    log_file.flush()
+            except Exception as e:
+                print(f"Error writing to CSV: {e}")
+
+            if stop:
+                return
+
 
 def main():
     """Main entry point"""